@@ -15,6 +15,7 @@ from typing import (
     List,
     Optional,
     Set,
+    Tuple,
     Type,
     TypeVar,
 )
@@ -69,6 +70,12 @@ class EventLog:
 
         self._topic_name_to_events: Dict[TopicName, List[Event]] = {}
 
+        # for each topic, the timestamp and state of the most recent event whose
+        # payload has a state attribute (e.g. JobPayload). This lets last_state answer
+        # "what state is this topic in right now" with a single dict lookup instead of
+        # searching the event lists
+        self._latest_states: Dict[TopicName, Tuple[Timestamp, Any]] = {}
+
         # subscribers to a specific topic
         self._topic_subscribers: Dict[TopicName, Set[Subscriber]] = {}
 
@@ -114,6 +121,10 @@ class EventLog:
         self._event_log.append(event)
         self._topic_name_to_events.setdefault(topic_name, []).append(event)
 
+        state = getattr(payload, "state", None)
+        if state is not None:
+            self._latest_states[topic_name] = (event.timestamp, state)
+
         # Tell the call_subscribers_loop to wake up. Importantly, there's no guarantee
         # that the call_subscribers_loop will happen once per event--the loop might get
         # "backed up" until multiple events have been posted first, and then multiple
@@ -179,6 +190,47 @@ class EventLog:
                 return event
         return None
 
+    def last_events_batch(
+        self, topic_names: Iterable[TopicName], timestamp: Timestamp
+    ) -> Dict[TopicName, Event]:
+        """
+        Equivalent to calling last_event for each of topic_names, returned as a dict.
+        Topic names that have no event with event.timestamp <= timestamp are omitted.
+        Batching the lookups amortizes the per-call overhead for callers like the
+        scheduler's poll loop that need the latest event for many topics at once.
+        """
+        result: Dict[TopicName, Event] = {}
+        topic_name_to_events = self._topic_name_to_events
+        for topic_name in topic_names:
+            all_events = topic_name_to_events.get(topic_name)
+            if all_events:
+                for event in reversed(all_events):
+                    if event.timestamp <= timestamp:
+                        result[topic_name] = event
+                        break
+        return result
+
+    def last_state(self, topic_name: TopicName, timestamp: Timestamp) -> Optional[Any]:
+        """
+        Return the state (i.e. the payload's state attribute) of the most recent event
+        with event.timestamp <= timestamp. None if no such event exists or the payload
+        has no state.
+
+        This is equivalent to last_event(...).payload.state but is a single dict lookup
+        in the common case where timestamp is at least as recent as the topic's latest
+        state-carrying event.
+        """
+        latest = self._latest_states.get(topic_name)
+        if latest is not None and latest[0] <= timestamp:
+            return latest[1]
+
+        # either we've never seen a state for this topic, or events newer than
+        # timestamp have been appended since, so search for the event as of timestamp
+        event = self.last_event(topic_name, timestamp)
+        if event is None:
+            return None
+        return getattr(event.payload, "state", None)
+
     def subscribe(
         self, topic_names: Optional[Iterable[TopicName]], subscriber: Subscriber
     ) -> None:
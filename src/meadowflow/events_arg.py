@@ -189,7 +189,9 @@ def _replace_latest_events_arg(
     if len(topic_names) == 0:
         topic_names = job.all_subscribed_topics or tuple()
 
+    # topics that have no events yet still need to show up (with a None event), which
+    # is why we can't just wrap the result of last_events_batch directly
+    last_events = event_log.last_events_batch(topic_names, latest_timestamp)
     return FrozenDict(
-        (topic_name, event_log.last_event(topic_name, latest_timestamp))
-        for topic_name in topic_names
+        (topic_name, last_events.get(topic_name)) for topic_name in topic_names
     )
@@ -3,18 +3,22 @@ from __future__ import annotations
 import abc
 import dataclasses
 import functools
+import itertools
 import random
 import traceback
 import uuid
 from dataclasses import dataclass
 from typing import (
     Final,
+    FrozenSet,
     Iterable,
     Sequence,
     List,
     Any,
     Dict,
     Optional,
+    Tuple,
+    TypeVar,
     Union,
     Literal,
     Callable,
@@ -58,6 +62,55 @@ JobState = Literal[
 ]
 
 
+_TType = TypeVar("_TType", bound=type)
+
+
+def _slotted_getstate(self: Any) -> Tuple[Any, ...]:
+    """See _add_slots"""
+    return tuple(getattr(self, f.name) for f in dataclasses.fields(self))
+
+
+def _slotted_setstate(self: Any, state: Tuple[Any, ...]) -> None:
+    """See _add_slots"""
+    for f, value in zip(dataclasses.fields(self), state):
+        object.__setattr__(self, f.name, value)
+
+
+def _add_slots(cls: _TType) -> _TType:
+    """
+    Rebuilds a dataclass with __slots__ for its fields, eliminating the per-instance
+    __dict__--these classes get created per event/per run, so the memory and
+    attribute-lookup savings add up. This is what @dataclass(slots=True) does on
+    Python 3.10+ (including the pickling fix-up--the default __setstate__ assigns via
+    setattr, which frozen dataclasses forbid); we do it ourselves while we still
+    support 3.9. Adapted from the dataclass author's add_slots recipe.
+    """
+    if "__slots__" in cls.__dict__:
+        raise TypeError(f"{cls.__name__} already specifies __slots__")
+
+    # the class has to be recreated rather than modified in place: __slots__ only has
+    # an effect at class creation time, and the field defaults stored as class
+    # attributes would conflict with the slots (the defaults live on in __init__'s
+    # __defaults__, so removing the class attributes is safe)
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(f.name for f in dataclasses.fields(cls))
+    cls_dict["__slots__"] = field_names
+    for field_name in field_names:
+        cls_dict.pop(field_name, None)
+    cls_dict.pop("__dict__", None)
+
+    if cls.__dataclass_params__.frozen:  # type: ignore[attr-defined]
+        cls_dict["__getstate__"] = _slotted_getstate
+        cls_dict["__setstate__"] = _slotted_setstate
+
+    qualname = getattr(cls, "__qualname__", None)
+    new_cls: _TType = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    if qualname is not None:
+        new_cls.__qualname__ = qualname
+    return new_cls
+
+
+@_add_slots
 @dataclass(frozen=True)
 class RaisedException:
     """Represents a python exception raised by a remote process"""
@@ -67,6 +120,7 @@ class RaisedException:
     exception_traceback: str
 
 
+@_add_slots
 @dataclass(frozen=True)
 class JobPayload:
     """The Event.payload for Job-related events. See JobStateType docstring."""
@@ -88,6 +142,7 @@ class JobPayload:
     return_code: Optional[int] = None
 
 
+@_add_slots
 @dataclasses.dataclass(frozen=True)
 class LocalFunction:
     """
@@ -177,6 +232,12 @@ class Job(meadowflow.topic.Topic):
     # all topic_names that trigger_actions are dependent on
     all_subscribed_topics: Optional[Sequence[TopicName]] = None
 
+    # caches the result of filtering the available job runners by
+    # job_runner_predicate/can_run_function, keyed by the type of the
+    # job_runner_function (see choose_job_runner). The Scheduler clears this whenever
+    # the set of available job runners changes.
+    compatible_job_runners_cache: Optional[Dict[type, List[JobRunner]]] = None
+
     def __post_init__(self) -> None:
         if self.scope == ALL_SCOPES:
             raise ValueError("Job.scope cannot be set to ALL_SCOPES")
@@ -185,6 +246,7 @@ class Job(meadowflow.topic.Topic):
             raise ValueError("Job.name cannot be set to CURRENT_JOB")
 
 
+@_add_slots
 @dataclass
 class JobRunOverrides:
     """
@@ -207,24 +269,26 @@ class JobRunOverrides:
 
 
 async def _apply_job_run_overrides(
-    run_overrides: Optional[JobRunOverrides],
+    run_overrides: JobRunOverrides,
     job_runner_function: JobRunnerFunction,
     credentials_dict: CredentialsDict,
 ) -> JobRunnerFunction:
-    """Applies run_overrides to job_runner_function"""
-    if run_overrides is not None:
-        job_runner_function = _apply_overrides_function_args_kwargs(
-            run_overrides, job_runner_function
-        )
-        job_runner_function = _apply_overrides_context_variables(
-            run_overrides, job_runner_function
-        )
-        job_runner_function = _apply_overrides_meadowdb_userspace(
-            run_overrides, job_runner_function
-        )
-        job_runner_function = await _apply_overrides_code_deployment(
-            run_overrides, job_runner_function, credentials_dict
-        )
+    """
+    Applies run_overrides to job_runner_function. Callers should not bother calling
+    this at all when run_overrides is None (i.e. the normal triggered-run case).
+    """
+    job_runner_function = _apply_overrides_function_args_kwargs(
+        run_overrides, job_runner_function
+    )
+    job_runner_function = _apply_overrides_context_variables(
+        run_overrides, job_runner_function
+    )
+    job_runner_function = _apply_overrides_meadowdb_userspace(
+        run_overrides, job_runner_function
+    )
+    job_runner_function = await _apply_overrides_code_deployment(
+        run_overrides, job_runner_function, credentials_dict
+    )
 
     return job_runner_function
 
@@ -244,6 +308,34 @@ def _raise_override_error(
     )
 
 
+def _apply_args_kwargs_local(
+    job_runner_function: LocalFunction, to_replace: Dict[str, Any]
+) -> JobRunnerFunction:
+    """Helper for _apply_overrides_function_args_kwargs"""
+    return dataclasses.replace(job_runner_function, **to_replace)
+
+
+def _apply_args_kwargs_deployed_runnable(
+    job_runner_function: MeadowGridDeployedRunnable, to_replace: Dict[str, Any]
+) -> JobRunnerFunction:
+    """Helper for _apply_overrides_function_args_kwargs"""
+    if not isinstance(job_runner_function.runnable, MeadowGridFunction):
+        _raise_override_error("function_args/function_kwargs", job_runner_function)
+    return dataclasses.replace(
+        job_runner_function,
+        runnable=dataclasses.replace(job_runner_function.runnable, **to_replace),
+    )
+
+
+# dispatches on type(job_runner_function) so that applying an override is a single
+# dict lookup rather than a chain of isinstance checks. Fine as long as no one
+# subclasses the JobRunnerFunction types (which nothing does today)
+_ARGS_KWARGS_APPLIERS: Final[Dict[type, Callable[[Any, Dict[str, Any]], Any]]] = {
+    LocalFunction: _apply_args_kwargs_local,
+    MeadowGridDeployedRunnable: _apply_args_kwargs_deployed_runnable,
+}
+
+
 def _apply_overrides_function_args_kwargs(
     run_overrides: JobRunOverrides, job_runner_function: JobRunnerFunction
 ) -> JobRunnerFunction:
@@ -255,60 +347,82 @@ def _apply_overrides_function_args_kwargs(
         if run_overrides.function_kwargs:
             to_replace["function_kwargs"] = run_overrides.function_kwargs
 
-        if isinstance(job_runner_function, LocalFunction):
-            job_runner_function = dataclasses.replace(job_runner_function, **to_replace)
-        elif isinstance(job_runner_function, MeadowGridDeployedRunnable) and isinstance(
-            job_runner_function.runnable, MeadowGridFunction
-        ):
-            job_runner_function = dataclasses.replace(
-                job_runner_function,
-                runnable=dataclasses.replace(
-                    job_runner_function.runnable, **to_replace
-                ),
-            )
-        else:
+        applier = _ARGS_KWARGS_APPLIERS.get(type(job_runner_function))
+        if applier is None:
             _raise_override_error("function_args/function_kwargs", job_runner_function)
+        else:
+            job_runner_function = applier(job_runner_function, to_replace)
     return job_runner_function
 
 
+def _apply_context_variables_deployed_runnable(
+    job_runner_function: MeadowGridDeployedRunnable, context_variables: Dict[str, Any]
+) -> JobRunnerFunction:
+    """Helper for _apply_overrides_context_variables"""
+    if not isinstance(job_runner_function.runnable, MeadowGridCommand):
+        _raise_override_error("context_variables", job_runner_function)
+    return dataclasses.replace(
+        job_runner_function,
+        runnable=dataclasses.replace(
+            job_runner_function.runnable, context_variables=context_variables
+        ),
+    )
+
+
+# see comment on _ARGS_KWARGS_APPLIERS
+_CONTEXT_VARIABLES_APPLIERS: Final[Dict[type, Callable[[Any, Dict[str, Any]], Any]]] = {
+    MeadowGridDeployedRunnable: _apply_context_variables_deployed_runnable,
+}
+
+
 def _apply_overrides_context_variables(
     run_overrides: JobRunOverrides, job_runner_function: JobRunnerFunction
 ) -> JobRunnerFunction:
     """Breaking out _apply_job_run_overrides into more readable chunks"""
     if run_overrides.context_variables:
-        if isinstance(job_runner_function, MeadowGridDeployedRunnable) and isinstance(
-            job_runner_function.runnable, MeadowGridCommand
-        ):
-            job_runner_function = dataclasses.replace(
-                job_runner_function,
-                runnable=dataclasses.replace(
-                    job_runner_function.runnable,
-                    context_variables=run_overrides.context_variables,
-                ),
-            )
-        else:
+        applier = _CONTEXT_VARIABLES_APPLIERS.get(type(job_runner_function))
+        if applier is None:
             _raise_override_error("context_variables", job_runner_function)
+        else:
+            job_runner_function = applier(
+                job_runner_function, run_overrides.context_variables
+            )
     return job_runner_function
 
 
+def _apply_meadowdb_userspace_deployed_runnable(
+    job_runner_function: MeadowGridDeployedRunnable, meadowdb_userspace: str
+) -> JobRunnerFunction:
+    """Helper for _apply_overrides_meadowdb_userspace"""
+    # this needs to line up with
+    # meadowdb.connection._MEADOWDB_DEFAULT_USERSPACE but we prefer not
+    # taking the dependency here
+    new_dict = {"MEADOWDB_DEFAULT_USERSPACE": meadowdb_userspace}
+    if job_runner_function.environment_variables:
+        job_runner_function.environment_variables.update(**new_dict)
+        return job_runner_function
+    else:
+        return dataclasses.replace(job_runner_function, environment_variables=new_dict)
+
+
+# see comment on _ARGS_KWARGS_APPLIERS
+_MEADOWDB_USERSPACE_APPLIERS: Final[Dict[type, Callable[[Any, str], Any]]] = {
+    MeadowGridDeployedRunnable: _apply_meadowdb_userspace_deployed_runnable,
+}
+
+
 def _apply_overrides_meadowdb_userspace(
     run_overrides: JobRunOverrides, job_runner_function: JobRunnerFunction
 ) -> JobRunnerFunction:
     """Breaking out _apply_job_run_overrides into more readable chunks"""
     if run_overrides.meadowdb_userspace:
-        if isinstance(job_runner_function, MeadowGridDeployedRunnable):
-            # this needs to line up with
-            # meadowdb.connection._MEADOWDB_DEFAULT_USERSPACE but we prefer not
-            # taking the dependency here
-            new_dict = {"MEADOWDB_DEFAULT_USERSPACE": run_overrides.meadowdb_userspace}
-            if job_runner_function.environment_variables:
-                job_runner_function.environment_variables.update(**new_dict)
-            else:
-                job_runner_function = dataclasses.replace(
-                    job_runner_function, environment_variables=new_dict
-                )
-        else:
+        applier = _MEADOWDB_USERSPACE_APPLIERS.get(type(job_runner_function))
+        if applier is None:
             _raise_override_error("meadowdb_userspace", job_runner_function)
+        else:
+            job_runner_function = applier(
+                job_runner_function, run_overrides.meadowdb_userspace
+            )
     return job_runner_function
 
 
@@ -340,6 +454,20 @@ async def _apply_overrides_code_deployment(
     return job_runner_function
 
 
+# Generates run_request_ids. A fresh uuid4 per request would mean a syscall
+# (os.urandom) plus hex formatting on every dispatch; instead we pay for one uuid4 at
+# import time and append a counter. The random prefix keeps ids unique across processes
+# (e.g. multiple meadowflow servers talking to the same meadowgrid coordinator), the
+# counter keeps them unique within this process.
+_run_request_id_prefix: Final = uuid.uuid4().hex
+_run_request_ids: Final = itertools.count()
+
+
+def _next_run_request_id() -> str:
+    return f"{_run_request_id_prefix}-{next(_run_request_ids)}"
+
+
+@_add_slots
 @dataclass(frozen=True)
 class Run(meadowflow.topic.Action[Job]):
     """Runs the job"""
@@ -369,7 +497,7 @@ class Run(meadowflow.topic.Action[Job]):
             assert ev.payload.request_id is not None
             return ev.payload.request_id
 
-        run_request_id = str(uuid.uuid4())
+        run_request_id = _next_run_request_id()
         event_log.append_event(job.name, JobPayload(run_request_id, "RUN_REQUESTED"))
 
         try:
@@ -402,10 +530,12 @@ class Run(meadowflow.topic.Action[Job]):
                     f"JobRunnerFunction, instead is a {type(job.job_function)}"
                 )
 
-            # Apply any JobRunOverrides
-            job_runner_function = await _apply_job_run_overrides(
-                run_overrides, job_runner_function, credentials_dict
-            )
+            # Apply any JobRunOverrides. Triggered runs never have overrides, so skip
+            # the whole override machinery in that case
+            if run_overrides is not None:
+                job_runner_function = await _apply_job_run_overrides(
+                    run_overrides, job_runner_function, credentials_dict
+                )
 
             # replace any LatestEventArgs
             job_runner_function = meadowflow.events_arg.replace_latest_events(
@@ -446,17 +576,31 @@ def choose_job_runner(
     """
     Chooses a job_runner that is compatible with job.
 
+    The result of filtering job_runners is cached on the job, keyed by the type of
+    job_runner_function--can_run_function implementations only look at the type of the
+    job_runner_function, and job_runner_predicate only looks at the job_runner, so
+    re-filtering on every run would always produce the same list. The Scheduler clears
+    these caches when job runners are added.
+
     TODO this logic should be much more sophisticated, look at available resources, etc.
     """
-    if job.job_runner_predicate is None:
-        compatible_job_runners = job_runners
-    else:
+    if job.compatible_job_runners_cache is None:
+        job.compatible_job_runners_cache = {}
+
+    compatible_job_runners = job.compatible_job_runners_cache.get(
+        type(job_runner_function)
+    )
+    if compatible_job_runners is None:
+        predicate = job.job_runner_predicate
         compatible_job_runners = [
-            jr for jr in job_runners if job.job_runner_predicate.apply(jr)
+            jr
+            for jr in job_runners
+            if (predicate is None or predicate.apply(jr))
+            and jr.can_run_function(job_runner_function)
         ]
-    compatible_job_runners = [
-        jr for jr in compatible_job_runners if jr.can_run_function(job_runner_function)
-    ]
+        job.compatible_job_runners_cache[
+            type(job_runner_function)
+        ] = compatible_job_runners
 
     if len(compatible_job_runners) == 0:
         # TODO this should probably get sent to the event log somehow. Also, what if we
@@ -477,6 +621,7 @@ class Actions:
     # TODO other actions: abort, bypass, init, pause
 
 
+@_add_slots
 @dataclass(frozen=True)
 class AnyJobStateEventFilter(meadowflow.topic.EventFilter):
     """Triggers when any of job_names is in any of on_states"""
@@ -484,13 +629,24 @@ class AnyJobStateEventFilter(meadowflow.topic.EventFilter):
     job_names: Sequence[TopicName]
     on_states: Sequence[JobState]
 
+    # frozenset of on_states, computed in __post_init__--apply gets called for every
+    # event on the subscribed topics, so membership should be a hash lookup rather
+    # than a scan of on_states
+    _on_states_set: FrozenSet[JobState] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_on_states_set", frozenset(self.on_states))
+
     def topic_names_to_subscribe(self) -> Iterable[TopicName]:
         yield from self.job_names
 
     def apply(self, event: Event) -> bool:
-        return event.payload.state in self.on_states
+        return event.payload.state in self._on_states_set
 
 
+@_add_slots
 @dataclass(frozen=True)
 class AllJobStatePredicate(meadowflow.topic.StatePredicate):
     """
@@ -501,6 +657,15 @@ class AllJobStatePredicate(meadowflow.topic.StatePredicate):
     job_names: Sequence[TopicName]
     on_states: Sequence[JobState]
 
+    # frozenset of on_states, computed in __post_init__ so that apply is a hash lookup
+    # per job name rather than a scan of on_states
+    _on_states_set: FrozenSet[JobState] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_on_states_set", frozenset(self.on_states))
+
     def topic_names_to_query(self) -> Iterable[TopicName]:
         yield from self.job_names
 
@@ -516,17 +681,47 @@ class AllJobStatePredicate(meadowflow.topic.StatePredicate):
             if job_name == CURRENT_JOB:
                 job_name = current_job_name
 
-            # Make sure the most recent event is in the specified state. Technically,
-            # the latest_event is None check should not be required because jobs always
-            # get created in the "WAITING" state, but there's no reason to take that
-            # assumption here.
-            latest_event = event_log.last_event(job_name, high_timestamp)
-            if latest_event is None or latest_event.payload.state not in self.on_states:
+            # Make sure the most recent state is one of the specified states. last_state
+            # returns None if there are no events, which can technically never happen
+            # because jobs always get created in the "WAITING" state, but there's no
+            # reason to take that assumption here--None is simply never in
+            # _on_states_set.
+            if (
+                event_log.last_state(job_name, high_timestamp)
+                not in self._on_states_set
+            ):
                 return False
 
         return True
 
 
+def resolve_current_job(
+    state_predicate: meadowflow.topic.StatePredicate, current_job_name: TopicName
+) -> meadowflow.topic.StatePredicate:
+    """
+    Replaces the CURRENT_JOB placeholder in any AllJobStatePredicates with
+    current_job_name. The scheduler calls this once at subscription time so that apply
+    doesn't need to do the substitution on every event. apply still supports
+    CURRENT_JOB for predicates that haven't gone through this function.
+    """
+    if (
+        isinstance(state_predicate, AllJobStatePredicate)
+        and CURRENT_JOB in state_predicate.job_names
+    ):
+        # _on_states_set is init=False so replace recomputes it via __post_init__
+        return dataclasses.replace(
+            state_predicate,
+            job_names=tuple(
+                current_job_name if job_name == CURRENT_JOB else job_name
+                for job_name in state_predicate.job_names
+            ),
+        )
+    else:
+        return state_predicate.map(
+            functools.partial(resolve_current_job, current_job_name=current_job_name)
+        )
+
+
 # Note 1
 # This really belongs in scopes.py but the circular dependencies make it hard to
 # do that.
@@ -597,18 +792,24 @@ def add_scope_jobs_decorator(
         # now call the wrapped function
         jobs_to_add = func(scope, *args, **kwargs)
 
-        # now adjust the names of the returned jobs
+        # now adjust the names of the returned jobs. Check for name/scope key
+        # collisions with a single set operation and merge with a single dict update
+        # rather than going key by key for every job
+        scope_keys = scope.keys()
+        scope_items = scope.items()
         for job in jobs_to_add:
             name = job.name.as_mutable()
-            for key, value in scope.items():
-                if key in name:
-                    raise ValueError(
-                        f"Cannot create job {job.name} in scope because both job name "
-                        f"and scope have a {key} key"
-                    )
-                name[key] = value
+            if not scope_keys.isdisjoint(name):
+                conflicting_keys = ", ".join(
+                    str(key) for key in scope_keys & name.keys()
+                )
+                raise ValueError(
+                    f"Cannot create job {job.name} in scope because both job name "
+                    f"and scope have key(s): {conflicting_keys}"
+                )
+            name.update(scope_items)
             job.scope = scope
-            job.name = TopicName(name)
+            job.name = TopicName.of(name)
 
         return jobs_to_add
 
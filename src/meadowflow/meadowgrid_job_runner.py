@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import pickle
 from types import TracebackType
-from typing import Iterable, Optional, Type
+from typing import Iterable, Optional, Set, Type
 
 from meadowflow.event_log import Event, EventLog
 from meadowflow.jobs import (
@@ -30,6 +30,11 @@ class MeadowGridJobRunner(JobRunner):
     def __init__(self, event_log: EventLog, address: str = DEFAULT_COORDINATOR_ADDRESS):
         self._client = MeadowGridCoordinatorClientAsync(address)
         self._event_log = event_log
+        # run_request_ids that were dispatched to this job runner. poll_jobs gets
+        # called with the active jobs of all job runners, so this lets us only query
+        # the coordinator about jobs we actually own (and skip the round-trip
+        # entirely when we own none of them)
+        self._request_ids: Set[str] = set()
 
     async def _run_deployed_runnable(
         self,
@@ -37,6 +42,7 @@ class MeadowGridJobRunner(JobRunner):
         run_request_id: str,
         deployed_runnable: MeadowGridDeployedRunnable,
     ) -> None:
+        self._request_ids.add(run_request_id)
         result = await self._client.add_py_runnable_job(
             run_request_id, job_name.as_file_name(), deployed_runnable
         )
@@ -82,7 +88,11 @@ class MeadowGridJobRunner(JobRunner):
         ProcessState into a JobPayload
         """
 
-        last_events = list(last_events)
+        last_events = [
+            e for e in last_events if e.payload.request_id in self._request_ids
+        ]
+        if not last_events:
+            return
 
         process_states = await self._client.get_simple_job_states(
             [e.payload.request_id for e in last_events]  # type: ignore[misc]
@@ -194,6 +204,10 @@ class MeadowGridJobRunner(JobRunner):
                     )
                 self._event_log.append_event(topic_name, new_payload)
 
+            if new_payload.state in ("SUCCEEDED", "CANCELLED", "FAILED"):
+                # we won't be polled for this request again
+                self._request_ids.discard(request_id)  # type: ignore[arg-type]
+
     def can_run_function(self, job_runner_function: JobRunnerFunction) -> bool:
         return isinstance(
             job_runner_function,
@@ -28,8 +28,16 @@ from typing import (
 from meadowdb.connection import ConnectionKey
 
 from meadowflow.effects import MeadowdbDynamicDependency
-from meadowflow.event_log import Event, EventLog, Timestamp
-from meadowflow.jobs import Actions, Job, JobPayload, JobRunner, JobRunOverrides
+from meadowflow.event_log import Event, EventLog, Subscriber, Timestamp
+from meadowflow.jobs import (
+    Actions,
+    AnyJobStateEventFilter,
+    Job,
+    JobPayload,
+    JobRunner,
+    JobRunOverrides,
+    resolve_current_job,
+)
 from meadowflow.local_job_runner import LocalJobRunner
 from meadowflow.scopes import ALL_SCOPES, ScopeValues
 from meadowflow.time_event_publisher import (
@@ -37,9 +45,20 @@ from meadowflow.time_event_publisher import (
     create_time_event_filters,
     create_time_event_state_predicates,
 )
-from meadowflow.topic import Action, EventFilter, StatePredicate, Topic
+from meadowflow.topic import (
+    Action,
+    EventFilter,
+    StatePredicate,
+    Topic,
+    TopicEventFilter,
+    TruePredicate,
+)
 from meadowflow.topic_names import TopicName
 
+# the JobStates that mean a job is active from the scheduler's point of view, i.e. we
+# need to poll the job runners to find out what's happening with it
+_RUNNING_STATES: Final = frozenset(("RUN_REQUESTED", "RUNNING"))
+
 
 @overload
 def _get_jobs_or_scopes_from_result(result: Job) -> Tuple[Literal["jobs"], List[Job]]:
@@ -132,6 +151,69 @@ def _get_jobs_or_scopes_from_result(
         return "none", None
 
 
+def _compile_specialized_subscriber(
+    event_filter: EventFilter,
+    condition: StatePredicate,
+    action: Action,
+    job: Job,
+    topic_names_set: frozenset,
+    event_log: EventLog,
+    job_runners: List[JobRunner],
+) -> Optional[Subscriber]:
+    """
+    Generates a subscriber specialized to the given trigger via exec. For the common
+    wake_on shapes (AnyJobStateEventFilter and TopicEventFilter) the per-event check
+    can be inlined into the generated source as set-membership tests, which avoids
+    dispatching through EventFilter.apply for every event in every batch, and a
+    TruePredicate condition can be dropped entirely. Returns None for wake_ons whose
+    structure we can't inline, in which case the caller should fall back to the
+    generic subscriber.
+    """
+    namespace: Dict[str, Any] = {
+        "_event_log": event_log,
+        "_job_runners": job_runners,
+        "_job": job,
+        "_action": action,
+        "_condition": condition,
+        "_topic_names_set": topic_names_set,
+    }
+
+    if isinstance(event_filter, AnyJobStateEventFilter):
+        namespace["_on_states_set"] = frozenset(event_filter.on_states)
+        wake_check = (
+            "event.topic_name in _topic_names_set"
+            " and event.payload.state in _on_states_set"
+        )
+    elif isinstance(event_filter, TopicEventFilter):
+        # TopicEventFilter.apply is always true, so only the topic check remains
+        wake_check = "event.topic_name in _topic_names_set"
+    else:
+        return None
+
+    lines = [
+        "async def _subscriber(low_timestamp, high_timestamp, events):",
+        f"    if any({wake_check} for event in events):",
+    ]
+    if isinstance(condition, TruePredicate):
+        lines.append(
+            "        await _action.execute("
+            "_job, None, _job_runners, _event_log, high_timestamp)"
+        )
+    else:
+        lines.extend(
+            [
+                "        if _condition.apply(",
+                "            _event_log, low_timestamp, high_timestamp, _job.name",
+                "        ):",
+                "            await _action.execute("
+                "_job, None, _job_runners, _event_log, high_timestamp)",
+            ]
+        )
+
+    exec("\n".join(lines), namespace)
+    return namespace["_subscriber"]
+
+
 @dataclasses.dataclass
 class MeadowdbDependencyAction:
     """
@@ -184,6 +266,12 @@ class Scheduler:
         ] = {}
         self._meadowdb_dependencies_name: Dict[TopicName, MeadowdbDependencyAction] = {}
 
+        # names of jobs that are currently in the RUN_REQUESTED or RUNNING state,
+        # maintained by _update_active_jobs. This means we only have to poll the jobs
+        # that are actually doing something rather than scanning every job we know
+        # about on every poll
+        self._active_jobs: Set[TopicName] = set()
+
         # how frequently to poll the job runners
         self._job_runner_poll_delay_seconds: float = job_runner_poll_delay_seconds
 
@@ -201,6 +289,8 @@ class Scheduler:
         )
         # create the effects subscriber
         self._event_log.subscribe(None, self._process_effects)
+        # keep track of which jobs are active
+        self._event_log.subscribe(None, self._update_active_jobs)
 
         # The local job runner is a special job runner that runs on the same machine as
         # meadowflow via multiprocessing.
@@ -208,6 +298,10 @@ class Scheduler:
         # all job runners that have been added to this scheduler
         self._job_runners: List[JobRunner] = [self._local_job_runner]
 
+        # wakes up the poll loop when a job becomes active, so that the loop doesn't
+        # have to poll on a timer when nothing is running
+        self._poll_wakeup: asyncio.Event = asyncio.Event()
+
         self._poll_job_runners_loop = asyncio.create_task(
             self._call_poll_job_runners_loop()
         )
@@ -227,6 +321,10 @@ class Scheduler:
         TODO add graceful shutdown, deal with job runners going offline, etc.
         """
         self._job_runners.append(job_runner_constructor(self._event_log))
+        # the set of available job runners has changed, so any cached filterings of
+        # that set are no longer valid
+        for job in self._jobs.values():
+            job.compatible_job_runners_cache = None
 
     def add_job(self, job: Job) -> None:
         """
@@ -261,6 +359,9 @@ class Scheduler:
                 condition = create_time_event_state_predicates(
                     self.time, trigger_action.state_predicate
                 )
+                # resolve the CURRENT_JOB placeholder once here rather than on every
+                # call to apply
+                condition = resolve_current_job(condition, job.name)
 
                 for event_filter in trigger_action.wake_on:
                     # this registers time events in the EventFilter with our
@@ -283,6 +384,24 @@ class Scheduler:
                         ).append(dependency_action)
                         self._meadowdb_dependencies_name[job.name] = dependency_action
                     else:
+                        # topic_names_to_subscribe is a generator, so materialize it
+                        # once here--we need it in a few places below, and we
+                        # especially don't want the subscriber rebuilding it on every
+                        # batch of events
+                        topic_names = list(event_filter.topic_names_to_subscribe())
+                        topic_names_set = frozenset(topic_names)
+
+                        # for wake_ons whose structure we know, generate a fused
+                        # subscriber with the filter checks inlined
+                        compiled_subscriber = _compile_specialized_subscriber(
+                            event_filter,
+                            condition,
+                            trigger_action.action,
+                            job,
+                            topic_names_set,
+                            self._event_log,
+                            self._job_runners,
+                        )
 
                         async def subscriber(
                             low_timestamp: Timestamp,
@@ -293,14 +412,14 @@ class Scheduler:
                             event_filter: EventFilter = event_filter,
                             condition: StatePredicate = condition,
                             action: Action = trigger_action.action,
+                            topic_names_set: frozenset = topic_names_set,
                         ) -> None:
                             # first check that there's at least one event that passes
                             # the EventFilter
                             if any(
                                 event_filter.apply(event)
-                                for topic_name in event_filter.topic_names_to_subscribe()  # noqa: E501
                                 for event in events
-                                if event.topic_name == topic_name
+                                if event.topic_name in topic_names_set
                             ):
                                 # then check that the condition is met and if so execute
                                 # the action
@@ -323,15 +442,13 @@ class Scheduler:
                         #  in breaking out this create_job_subscriptions into a separate
                         #  function)
                         self._event_log.subscribe(
-                            event_filter.topic_names_to_subscribe(), subscriber
+                            topic_names, compiled_subscriber or subscriber
                         )
 
                         # TODO would be nice to somehow get the dynamically subscribed
                         #  "topics" into all_subscribed_topics as well somehow...
 
-                        job.all_subscribed_topics.extend(
-                            event_filter.topic_names_to_subscribe()
-                        )
+                        job.all_subscribed_topics.extend(topic_names)
                 job.all_subscribed_topics.extend(condition.topic_names_to_query())
         self._create_job_subscriptions_queue.clear()
 
@@ -530,14 +647,38 @@ class Scheduler:
             # that case, we shouldn't be getting here
             return f"Unexpected error: {str(e)}"
 
+    async def _update_active_jobs(
+        self, low_timestamp: Timestamp, high_timestamp: Timestamp, events: List[Event]
+    ) -> None:
+        """
+        Keeps _active_jobs up to date. Should get called for all events (subscribed in
+        _async_init).
+        """
+        # we want to apply state changes oldest first so that the most recent state
+        # wins
+        any_became_active = False
+        for event in reversed(events):
+            if isinstance(event.payload, JobPayload):
+                if event.payload.state in _RUNNING_STATES:
+                    self._active_jobs.add(event.topic_name)
+                    any_became_active = True
+                else:
+                    self._active_jobs.discard(event.topic_name)
+
+        if any_became_active:
+            self._poll_wakeup.set()
+
     def _get_running_and_requested_jobs(self) -> Iterable[Event[JobPayload]]:
         """
         Returns the latest event for any job that's in RUN_REQUESTED or RUNNING state
         """
         timestamp = self._event_log.next_timestamp
-        for name in self._jobs.keys():
-            ev = self._event_log.last_event(name, timestamp)
-            if ev and ev.payload.state in ("RUN_REQUESTED", "RUNNING"):
+        # _active_jobs can be slightly stale (it's updated by a subscriber), so we
+        # still check the latest event for each name rather than trusting the set
+        # blindly
+        last_events = self._event_log.last_events_batch(self._active_jobs, timestamp)
+        for ev in last_events.values():
+            if ev.payload.state in _RUNNING_STATES:
                 yield ev
 
     async def _call_poll_job_runners_loop(self) -> None:
@@ -550,16 +691,27 @@ class Scheduler:
                 # -> yes, because if we can't reach a job runner, we need to be able
                 # to change the state of those jobs, i.e. publish an event that changes
                 # state to UNREACHABLE.
-                last_events = list(self._get_running_and_requested_jobs())
-                results = await asyncio.gather(
-                    *[jr.poll_jobs(last_events) for jr in self._job_runners],
-                    return_exceptions=True,
-                )
-                for result in results:
-                    if result is not None:
-                        logging.exception(EXCEPTION_MESSAGE, exc_info=result)
-
-                await asyncio.sleep(self._job_runner_poll_delay_seconds)
+                if self._active_jobs:
+                    last_events = list(self._get_running_and_requested_jobs())
+                    results = await asyncio.gather(
+                        *[jr.poll_jobs(last_events) for jr in self._job_runners],
+                        return_exceptions=True,
+                    )
+                    for result in results:
+                        if result is not None:
+                            logging.exception(EXCEPTION_MESSAGE, exc_info=result)
+
+                # while jobs are active we poll on a timer, but when nothing is active
+                # just sleep until _update_active_jobs wakes us up
+                if self._active_jobs:
+                    timeout: Optional[float] = self._job_runner_poll_delay_seconds
+                else:
+                    timeout = None
+                try:
+                    await asyncio.wait_for(self._poll_wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._poll_wakeup.clear()
             except asyncio.CancelledError:
                 logging.info("Job runner poll loop cancelled.")
                 raise
@@ -599,9 +751,9 @@ class Scheduler:
         Returns true if everything is in a "waiting" state. I.e. no jobs are running,
         all subscribers have been processed.
         """
-        return self._event_log.all_subscribers_called() and not any(
-            True for _ in self._get_running_and_requested_jobs()
-        )
+        # once all subscribers have been called, _update_active_jobs has seen every
+        # event, so _active_jobs is exact
+        return self._event_log.all_subscribers_called() and not self._active_jobs
 
     def events_of(self, topic_name: TopicName) -> List[Event]:
         """For unit tests/debugging"""
@@ -53,6 +53,10 @@ class Action(ABC, Generic[TTopic]):
     after execution, i.e. it should create an event for the topic.
     """
 
+    # empty slots so that subclasses that declare __slots__ actually get instances
+    # without a __dict__
+    __slots__ = ()
+
     @abstractmethod
     async def execute(
         self,
@@ -71,6 +75,9 @@ class Action(ABC, Generic[TTopic]):
 class EventFilter(ABC):
     """See TriggerAction docstring"""
 
+    # see comment on Action
+    __slots__ = ()
+
     @abstractmethod
     def topic_names_to_subscribe(self) -> Iterable[TopicName]:
         """
@@ -104,6 +111,9 @@ class TopicEventFilter(EventFilter):
 class StatePredicate(ABC):
     """See TriggerAction docstring"""
 
+    # see comment on Action
+    __slots__ = ()
+
     @abstractmethod
     def topic_names_to_query(self) -> Iterable[TopicName]:
         """
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import weakref
 from typing import (
     Any,
+    ClassVar,
     Dict,
     Iterable,
     Iterator,
@@ -83,6 +85,29 @@ class FrozenDict(Mapping[TK, TV]):
 # TODO we should probably restrict these (as well as other places where we accept
 #  FrozenDict) to only take types that can be serialized in protobuf
 class TopicName(FrozenDict[str, Any]):
+    # Interned TopicNames, see of. Weak values so that names that are no longer
+    # referenced anywhere else can get collected. The key is a frozenset of the items
+    # rather than the TopicName itself because a WeakValueDictionary holds strong
+    # references to its keys--keying an entry by its own value would keep it alive
+    # forever.
+    _intern: ClassVar[weakref.WeakValueDictionary] = weakref.WeakValueDictionary()
+
+    @classmethod
+    def of(cls, *args: Any, **kwargs: Any) -> TopicName:
+        """
+        Like the constructor, but returns an existing equal instance if we've seen one
+        before. TopicNames get used as dict keys all over the place (_jobs, the event
+        log, FrozenDicts of events), so sharing instances means repeat hash/equality
+        checks hit the same memoized _hash and can short-circuit on identity.
+        """
+        candidate = cls(*args, **kwargs)
+        key = frozenset(candidate.items())
+        existing = cls._intern.get(key)
+        if existing is not None:
+            return existing
+        cls._intern[key] = candidate
+        return candidate
+
     def as_file_name(self) -> str:
         result = []
         parts = set()
@@ -142,4 +167,4 @@ def pname(s: str, /, **kv: Any) -> TopicName:
             raise ValueError(f"Cannot have multiple parts with the same name {key}")
         key_values[key] = value
 
-    return TopicName(key_values)
+    return TopicName.of(key_values)
@@ -63,9 +63,8 @@ def _get_coordinator_client_async(address: str) -> MeadowGridCoordinatorClientAs
     # grpc doesn't actually call asyncio.get_event_loop(), but I assume the behavior is
     # similar...
     # https://github.com/grpc/grpc/blob/60028a82a9ec546141ef98e92655cf0dfb35180e/src/python/grpcio/grpc/aio/_channel.py#L287
-    if (address, event_loop) in _coordinator_clients_async:
-        client = _coordinator_clients_async[(address, event_loop)]
-    else:
+    client = _coordinator_clients_async.get((address, event_loop))
+    if client is None:
         client = MeadowGridCoordinatorClientAsync(address)
         _coordinator_clients_async[(address, event_loop)] = client
     return client
@@ -73,9 +72,8 @@ def _get_coordinator_client_async(address: str) -> MeadowGridCoordinatorClientAs
 
 def _get_coordinator_client_sync(address: str) -> MeadowGridCoordinatorClientSync:
     """Get the cached coordinator client"""
-    if address in _coordinator_clients_sync:
-        client = _coordinator_clients_sync[address]
-    else:
+    client = _coordinator_clients_sync.get(address)
+    if client is None:
         client = MeadowGridCoordinatorClientSync(address)
         _coordinator_clients_sync[address] = client
     return client
@@ -3,6 +3,7 @@ from typing import List
 
 import pytest
 from meadowflow.event_log import Event, EventLog, Timestamp
+from meadowflow.jobs import JobPayload
 from meadowflow.topic_names import pname
 
 
@@ -43,6 +44,55 @@ async def test_events_and_state(event_log: EventLog) -> None:
     assert events[0:1] == actual
 
 
+@pytest.mark.asyncio
+async def test_last_events_batch(event_log: EventLog) -> None:
+    events = [
+        Event(0, pname("A"), "waiting"),
+        Event(1, pname("B"), "waiting"),
+        Event(2, pname("B"), "running"),
+        Event(3, pname("C"), "waiting"),
+    ]
+    for event in events:
+        event_log.append_event(event.topic_name, event.payload)
+
+    topic_names = [pname("A"), pname("B"), pname("C")]
+
+    # equivalent to calling last_event per topic
+    actual = event_log.last_events_batch(topic_names, 3)
+    assert actual == {name: event_log.last_event(name, 3) for name in topic_names}
+    assert actual == {
+        pname("A"): events[0],
+        pname("B"): events[2],
+        pname("C"): events[3],
+    }
+
+    # the timestamp cutoff applies per topic, and topics with no event at or before
+    # the timestamp are omitted (here C's only event is at timestamp 3)
+    actual = event_log.last_events_batch(topic_names, 1)
+    assert actual == {pname("A"): events[0], pname("B"): events[1]}
+
+    # unknown topics are omitted too
+    assert event_log.last_events_batch([pname("D")], 3) == {}
+
+
+@pytest.mark.asyncio
+async def test_last_state(event_log: EventLog) -> None:
+    event_log.append_event(pname("A"), JobPayload(None, "WAITING"))  # timestamp 0
+    event_log.append_event(pname("A"), JobPayload("request1", "RUNNING"))  # timestamp 1
+
+    # fast path: served from the cached latest state
+    assert event_log.last_state(pname("A"), 1) == "RUNNING"
+    assert event_log.last_state(pname("A"), 100) == "RUNNING"
+
+    # querying before the latest state-carrying event falls back to searching the log
+    assert event_log.last_state(pname("A"), 0) == "WAITING"
+
+    # no events at all, or a payload without a state attribute, gives None
+    assert event_log.last_state(pname("B"), 1) is None
+    event_log.append_event(pname("B"), "waiting")  # timestamp 2
+    assert event_log.last_state(pname("B"), 2) is None
+
+
 @pytest.mark.asyncio
 async def test_subscriber_notification(event_log: EventLog) -> None:
     called = asyncio.Event()
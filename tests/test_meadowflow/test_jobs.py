@@ -0,0 +1,31 @@
+import dataclasses
+import pickle
+
+from meadowflow.jobs import AnyJobStateEventFilter, JobPayload
+from meadowflow.topic_names import pname
+
+
+def test_add_slots_pickling() -> None:
+    """
+    The _add_slots-decorated classes are frozen dataclasses with __slots__, which
+    breaks the default pickling (__setstate__ assigns via setattr, which frozen
+    dataclasses forbid)--make sure the __getstate__/__setstate__ replacements
+    round-trip correctly.
+    """
+    payload = JobPayload("request1", "RUNNING", pid=2000)
+    assert not hasattr(payload, "__dict__")
+    assert pickle.loads(pickle.dumps(payload)) == payload
+
+    # also check a class with an init=False field computed in __post_init__
+    event_filter = AnyJobStateEventFilter([pname("A")], ["SUCCEEDED"])
+    unpickled = pickle.loads(pickle.dumps(event_filter))
+    assert unpickled == event_filter
+    assert unpickled._on_states_set == frozenset(("SUCCEEDED",))
+
+
+def test_add_slots_replace() -> None:
+    """dataclasses.replace should recompute the init=False fields via __post_init__"""
+    event_filter = AnyJobStateEventFilter([pname("A")], ["SUCCEEDED"])
+    replaced = dataclasses.replace(event_filter, on_states=["FAILED"])
+    assert replaced.job_names == event_filter.job_names
+    assert replaced._on_states_set == frozenset(("FAILED",))
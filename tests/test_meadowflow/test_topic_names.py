@@ -0,0 +1,26 @@
+import gc
+import weakref
+
+from meadowflow.topic_names import TopicName, pname
+
+
+def test_topic_name_interning() -> None:
+    a = pname("foo/bar", date=3)
+    b = pname("foo/bar", date=3)
+    assert a is b
+    assert TopicName.of({"part0": "foo", "part1": "bar", "date": 3}) is a
+
+    assert pname("foo/baz") is not a
+
+
+def test_topic_name_intern_entries_are_collectable() -> None:
+    """
+    The intern cache holds its values weakly (and is keyed by a frozenset of the items
+    rather than the TopicName itself, which would pin the value via the strong key
+    reference), so names that are no longer referenced anywhere should get collected.
+    """
+    name = TopicName.of(test_topic_name_intern="unique to this test")
+    ref = weakref.ref(name)
+    del name
+    gc.collect()
+    assert ref() is None